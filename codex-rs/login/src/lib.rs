@@ -4,12 +4,9 @@ use serde::Deserialize;
 use serde::Serialize;
 use std::env;
 use std::fs::File;
-use std::fs::OpenOptions;
 use std::fs::remove_file;
 use std::io::Read;
 use std::io::Write;
-#[cfg(unix)]
-use std::os::unix::fs::OpenOptionsExt;
 use std::path::Path;
 use std::path::PathBuf;
 use std::sync::Arc;
@@ -309,17 +306,27 @@ pub fn try_read_auth_json(auth_file: &Path) -> std::io::Result<AuthDotJson> {
     Ok(auth_dot_json)
 }
 
+/// Write `auth.json` atomically: the JSON is written and synced to a temp
+/// file in the same directory, which is then renamed over `auth_file`. A
+/// crash mid-write leaves the previous credentials intact rather than a
+/// truncated file.
 fn write_auth_json(auth_file: &Path, auth_dot_json: &AuthDotJson) -> std::io::Result<()> {
     let json_data = serde_json::to_string_pretty(auth_dot_json)?;
-    let mut options = OpenOptions::new();
-    options.truncate(true).write(true).create(true);
+    let dir = match auth_file.parent() {
+        Some(parent) if !parent.as_os_str().is_empty() => parent,
+        _ => Path::new("."),
+    };
+    // NamedTempFile is created with mode 0o600 on Unix.
+    let mut file = tempfile::NamedTempFile::new_in(dir)?;
+    file.write_all(json_data.as_bytes())?;
+    file.flush()?;
+    file.as_file().sync_all()?;
+    file.persist(auth_file)?;
     #[cfg(unix)]
     {
-        options.mode(0o600);
+        // Make the rename itself durable.
+        File::open(dir)?.sync_all()?;
     }
-    let mut file = options.open(auth_file)?;
-    file.write_all(json_data.as_bytes())?;
-    file.flush()?;
     Ok(())
 }
 
@@ -210,18 +210,37 @@ async fn process_request(
                 }
             };
 
-            match exchange_code_for_tokens(&opts.issuer, &opts.client_id, redirect_uri, pkce, &code)
-                .await
+            // Share one client (and its connection pool) across both token
+            // requests so the second call reuses the TLS connection.
+            let client = reqwest::Client::new();
+            match exchange_code_for_tokens(
+                &client,
+                &opts.issuer,
+                &opts.client_id,
+                redirect_uri,
+                pkce,
+                &code,
+            )
+            .await
             {
                 Ok(tokens) => {
                     // Obtain API key via token-exchange and persist
-                    let api_key = obtain_api_key(&opts.issuer, &opts.client_id, &tokens.id_token)
-                        .await
-                        .ok();
+                    let api_key =
+                        obtain_api_key(&client, &opts.issuer, &opts.client_id, &tokens.id_token)
+                            .await
+                            .ok();
+                    // Decode the id_token claims once and share them between
+                    // persisting and composing the success URL.
+                    let token_claims = jwt_auth_claims(&tokens.id_token);
+                    let account_id = token_claims
+                        .get("chatgpt_account_id")
+                        .and_then(|v| v.as_str())
+                        .map(str::to_string);
                     if let Err(err) = persist_tokens_async(
                         &opts.codex_home,
                         api_key.clone(),
                         tokens.id_token.clone(),
+                        account_id,
                         Some(tokens.access_token.clone()),
                         Some(tokens.refresh_token.clone()),
                     )
@@ -238,6 +257,7 @@ async fn process_request(
                         actual_port,
                         &opts.issuer,
                         &tokens.id_token,
+                        &token_claims,
                         &tokens.access_token,
                     );
                     match tiny_http::Header::from_bytes(&b"Location"[..], success_url.as_bytes()) {
@@ -310,6 +330,7 @@ struct ExchangedTokens {
 }
 
 async fn exchange_code_for_tokens(
+    client: &reqwest::Client,
     issuer: &str,
     client_id: &str,
     redirect_uri: &str,
@@ -323,7 +344,6 @@ async fn exchange_code_for_tokens(
         refresh_token: String,
     }
 
-    let client = reqwest::Client::new();
     let resp = client
         .post(format!("{issuer}/oauth/token"))
         .header("Content-Type", "application/x-www-form-urlencoded")
@@ -357,6 +377,7 @@ async fn persist_tokens_async(
     codex_home: &Path,
     api_key: Option<String>,
     id_token: String,
+    account_id: Option<String>,
     access_token: Option<String>,
     refresh_token: Option<String>,
 ) -> io::Result<()> {
@@ -364,9 +385,7 @@ async fn persist_tokens_async(
     let codex_home = codex_home.to_path_buf();
     tokio::task::spawn_blocking(move || {
         let auth_file = get_auth_file(&codex_home);
-        if let Some(parent) = auth_file.parent()
-            && !parent.exists()
-        {
+        if let Some(parent) = auth_file.parent() {
             std::fs::create_dir_all(parent).map_err(io::Error::other)?;
         }
 
@@ -379,11 +398,8 @@ async fn persist_tokens_async(
             .get_or_insert_with(crate::token_data::TokenData::default);
         tokens.id_token = crate::token_data::parse_id_token(&id_token).map_err(io::Error::other)?;
         // Persist chatgpt_account_id if present in claims
-        if let Some(acc) = jwt_auth_claims(&id_token)
-            .get("chatgpt_account_id")
-            .and_then(|v| v.as_str())
-        {
-            tokens.account_id = Some(acc.to_string());
+        if let Some(acc) = account_id {
+            tokens.account_id = Some(acc);
         }
         if let Some(at) = access_token {
             tokens.access_token = at;
@@ -409,8 +425,13 @@ fn read_or_default(path: &Path) -> AuthDotJson {
     }
 }
 
-fn compose_success_url(port: u16, issuer: &str, id_token: &str, access_token: &str) -> String {
-    let token_claims = jwt_auth_claims(id_token);
+fn compose_success_url(
+    port: u16,
+    issuer: &str,
+    id_token: &str,
+    token_claims: &serde_json::Map<String, serde_json::Value>,
+    access_token: &str,
+) -> String {
     let access_claims = jwt_auth_claims(access_token);
 
     let org_id = token_claims
@@ -488,13 +509,17 @@ fn jwt_auth_claims(jwt: &str) -> serde_json::Map<String, serde_json::Value> {
     serde_json::Map::new()
 }
 
-async fn obtain_api_key(issuer: &str, client_id: &str, id_token: &str) -> io::Result<String> {
+async fn obtain_api_key(
+    client: &reqwest::Client,
+    issuer: &str,
+    client_id: &str,
+    id_token: &str,
+) -> io::Result<String> {
     // Token exchange for an API key access token
     #[derive(serde::Deserialize)]
     struct ExchangeResp {
         access_token: String,
     }
-    let client = reqwest::Client::new();
     let resp = client
         .post(format!("{issuer}/oauth/token"))
         .header("Content-Type", "application/x-www-form-urlencoded")
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
 import argparse
+import codecs
+import io
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TextIO
 
 """
 Utility script that takes a list of files and returns non-zero if any of them
@@ -33,6 +38,11 @@ substitutions: dict[int, str] = {
     0x202F: " ",  # narrow non-breaking space
 }
 
+"""
+substitutions as a str.translate() table.
+"""
+_SUBSTITUTIONS_TABLE = str.maketrans({chr(cp): s for cp, s in substitutions.items()})
+
 """
 Unicode codepoints that are allowed in addition to ASCII.
 Be conservative with this list.
@@ -45,6 +55,33 @@ allowed_unicode_codepoints = {
     0x2728,  # sparkles
 }
 
+"""
+ASCII bytes that are always allowed: printable characters plus newline.
+"""
+_ALLOWED_ASCII_BYTES = bytes(range(0x20, 0x7F)) + b"\n"
+
+"""
+Matches any single character that is neither allowed ASCII nor in
+allowed_unicode_codepoints.
+"""
+_DISALLOWED_RE = re.compile(
+    r"[^\x20-\x7e\n"
+    + "".join(re.escape(chr(cp)) for cp in sorted(allowed_unicode_codepoints))
+    + "]"
+)
+
+"""
+Matches any byte that is not allowed ASCII. Used to scan chunks that are pure
+ASCII without decoding them.
+"""
+_DISALLOWED_ASCII_RE = re.compile(rb"[^\x20-\x7e\n]")
+
+"""
+Files are read and decoded in chunks of this many bytes so that large inputs
+are never held in memory twice.
+"""
+_CHUNK_SIZE = 1 << 20
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(
@@ -62,63 +99,121 @@ def main() -> int:
     )
     args = parser.parse_args()
 
+    def lint(filename: str) -> tuple[bool, str]:
+        out = io.StringIO()
+        return lint_utf8_ascii(Path(filename), fix=args.fix, out=out), out.getvalue()
+
+    # Lint files concurrently, buffering each file's report so the output
+    # still appears in command-line order. --fix rewrites files, so it runs
+    # one file at a time in case a path is listed more than once.
     has_errors = False
-    for filename in args.files:
-        path = Path(filename)
-        has_errors |= lint_utf8_ascii(path, fix=args.fix)
+    with ThreadPoolExecutor(max_workers=1 if args.fix else None) as executor:
+        for file_has_errors, output in executor.map(lint, args.files):
+            sys.stdout.write(output)
+            has_errors |= file_has_errors
     return 1 if has_errors else 0
 
 
-def lint_utf8_ascii(filename: Path, fix: bool) -> bool:
-    """Returns True if an error was printed."""
-    try:
-        with open(filename, "rb") as f:
-            raw = f.read()
-        text = raw.decode("utf-8")
-    except UnicodeDecodeError as e:
-        print("UTF-8 decoding error:")
-        print(f"  byte offset: {e.start}")
-        print(f"  reason: {e.reason}")
-        # Attempt to find line/column
-        partial = raw[: e.start]
-        line = partial.count(b"\n") + 1
-        col = e.start - (partial.rfind(b"\n") if b"\n" in partial else -1)
-        print(f"  location: line {line}, column {col}")
-        return True
-
+def lint_utf8_ascii(filename: Path, fix: bool, out: TextIO | None = None) -> bool:
+    """Returns True if an error was printed. Output goes to out (default stdout)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
     errors = []
-    for lineno, line in enumerate(text.splitlines(keepends=True), 1):
-        for colno, char in enumerate(line, 1):
-            codepoint = ord(char)
-            if char == "\n":
-                continue
-            if (
-                not (0x20 <= codepoint <= 0x7E)
-                and codepoint not in allowed_unicode_codepoints
-            ):
-                errors.append((lineno, colno, char, codepoint))
+    # Where the current chunk starts, in bytes and in decoded characters, the
+    # line it starts on, and where that line began (again in both units).
+    byte_offset = 0
+    char_offset = 0
+    lineno = 1
+    line_start = 0
+    line_start_byte = 0
+    with open(filename, "rb") as f:
+        while True:
+            raw = f.read(_CHUNK_SIZE)
+            # Bytes of an incomplete multi-byte sequence held over from the
+            # previous chunk. They never include a newline.
+            pending = len(decoder.getstate()[0])
+            if not pending and raw.isascii():
+                # ASCII (the common case) decodes to itself, so scan the raw
+                # bytes as they are and never build a str. If deleting every
+                # allowed byte leaves nothing behind, there is nothing to scan.
+                text = raw
+                newline = b"\n"
+                if raw.translate(None, _ALLOWED_ASCII_BYTES):
+                    disallowed_re = _DISALLOWED_ASCII_RE
+                else:
+                    disallowed_re = None
+            else:
+                try:
+                    text = decoder.decode(raw, final=not raw)
+                except UnicodeDecodeError as e:
+                    # e.start is relative to the pending bytes followed by raw.
+                    error_offset = byte_offset - pending + e.start
+                    print("UTF-8 decoding error:", file=out)
+                    print(f"  byte offset: {error_offset}", file=out)
+                    print(f"  reason: {e.reason}", file=out)
+                    # Attempt to find line/column, searching e.object in place
+                    # rather than copying everything before the error.
+                    line = lineno + e.object.count(b"\n", 0, e.start)
+                    last_nl = e.object.rfind(b"\n", 0, e.start)
+                    if last_nl != -1:
+                        line_start_byte = byte_offset - pending + last_nl + 1
+                    col = error_offset - line_start_byte + 1
+                    print(f"  location: line {line}, column {col}", file=out)
+                    return True
+                newline = "\n"
+                disallowed_re = _DISALLOWED_RE
+
+            # Walk forward from match to match (and then to the end of the
+            # chunk), counting the newlines in between, so line numbers come
+            # from the same single pass as the scan.
+            pos = 0
+            if disallowed_re is not None:
+                for m in disallowed_re.finditer(text):
+                    match_pos = m.start()
+                    num_newlines = text.count(newline, pos, match_pos)
+                    if num_newlines:
+                        lineno += num_newlines
+                        last_nl = text.rfind(newline, pos, match_pos)
+                        line_start = char_offset + last_nl + 1
+                    pos = match_pos
+                    # ord() accepts both a 1-character str and a 1-byte bytes.
+                    codepoint = ord(m.group())
+                    colno = char_offset + match_pos - line_start + 1
+                    errors.append((lineno, colno, chr(codepoint), codepoint))
+            num_newlines = text.count(newline, pos)
+            if num_newlines:
+                lineno += num_newlines
+                line_start = char_offset + text.rfind(newline, pos) + 1
+            last_nl = raw.rfind(b"\n")
+            if last_nl != -1:
+                line_start_byte = byte_offset + last_nl + 1
+            char_offset += len(text)
+            byte_offset += len(raw)
+            if not raw:
+                break
 
     if errors:
         for lineno, colno, char, codepoint in errors:
             safe_char = repr(char)[1:-1]  # nicely escape things like \u202f
             print(
-                f"Invalid character at line {lineno}, column {colno}: U+{codepoint:04X} ({safe_char})"
+                f"Invalid character at line {lineno}, column {colno}: U+{codepoint:04X} ({safe_char})",
+                file=out,
             )
 
     if errors and fix:
-        print(f"Attempting to fix {filename}...")
-        num_replacements = 0
-        new_contents = ""
-        for char in text:
-            codepoint = ord(char)
-            if codepoint in substitutions:
-                num_replacements += 1
-                new_contents += substitutions[codepoint]
-            else:
-                new_contents += char
+        print(f"Attempting to fix {filename}...", file=out)
+        # Every substitutable character is also a reported error.
+        num_replacements = sum(
+            1 for _, _, _, codepoint in errors if codepoint in substitutions
+        )
+        # The scan above streamed the file; rewriting it needs the whole text.
+        text = filename.read_bytes().decode("utf-8")
+        new_contents = text.translate(_SUBSTITUTIONS_TABLE)
         with open(filename, "w", encoding="utf-8") as f:
             f.write(new_contents)
-        print(f"Fixed {num_replacements} of {len(errors)} errors in {filename}.")
+        print(
+            f"Fixed {num_replacements} of {len(errors)} errors in {filename}.",
+            file=out,
+        )
 
     return bool(errors)
 
@@ -100,10 +100,11 @@ def main() -> int:
         npm_cmd.append("--dry-run")
     npm_cmd.append(str(artifact_path))
 
-    # Ensure CI is unset so npm can open a browser for 2FA if needed.
-    env = os.environ.copy()
-    if env.get("CI"):
-        env.pop("CI")
+    # Ensure CI is unset so npm can open a browser for 2FA if needed. When it
+    # is not set, pass env=None so npm simply inherits our environment.
+    env = None
+    if os.environ.get("CI"):
+        env = {k: v for k, v in os.environ.items() if k != "CI"}
 
     print("Running:", " ".join(npm_cmd))
     proc = subprocess.run(npm_cmd, env=env)
@@ -11,6 +11,8 @@ import argparse
 import sys
 import re
 import difflib
+import functools
+from itertools import chain
 from pathlib import Path
 from typing import List
 
@@ -18,6 +20,15 @@ from typing import List
 BEGIN_TOC: str = "<!-- Begin ToC -->"
 END_TOC: str = "<!-- End ToC -->"
 
+# Patterns and tables used to parse headings and build their anchors
+FENCE_RE = re.compile(r"\s*```")
+HEADING_RE = re.compile(r"^(#{2,6})\s+(.*)$")
+SLUG_PUNCTUATION_RE = re.compile(r"[^0-9a-z\s-]")
+# normalize spaces and dashes
+SLUG_TRANSLATION = str.maketrans(
+    {"\u00a0": " ", "\u2011": "-", "\u2013": "-", "\u2014": "-"}
+)
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(
@@ -34,20 +45,19 @@ def main() -> int:
     return check_or_fix(path, args.fix)
 
 
-def generate_toc_lines(content: str) -> List[str]:
+def generate_toc_lines(lines: List[str]) -> List[str]:
     """
-    Generate markdown list lines for headings (## to ######) in content.
+    Generate markdown list lines for headings (## to ######) in lines.
     """
-    lines = content.splitlines()
     headings = []
     in_code = False
     for line in lines:
-        if line.strip().startswith("```"):
+        if FENCE_RE.match(line):
             in_code = not in_code
             continue
         if in_code:
             continue
-        m = re.match(r"^(#{2,6})\s+(.*)$", line)
+        m = HEADING_RE.match(line)
         if not m:
             continue
         level = len(m.group(1))
@@ -57,17 +67,41 @@ def generate_toc_lines(content: str) -> List[str]:
     toc = []
     for level, text in headings:
         indent = "  " * (level - 2)
-        slug = text.lower()
-        # normalize spaces and dashes
-        slug = slug.replace("\u00a0", " ")
-        slug = slug.replace("\u2011", "-").replace("\u2013", "-").replace("\u2014", "-")
-        # drop other punctuation
-        slug = re.sub(r"[^0-9a-z\s-]", "", slug)
-        slug = slug.strip().replace(" ", "-")
+        slug = slugify(text)
         toc.append(f"{indent}- [{text}](#{slug})")
     return toc
 
 
+@functools.lru_cache(maxsize=None)
+def slugify(text: str) -> str:
+    """
+    Return the GitHub-style anchor for a heading's text.
+    """
+    slug = text.lower().translate(SLUG_TRANSLATION)
+    # drop other punctuation
+    slug = SLUG_PUNCTUATION_RE.sub("", slug)
+    return slug.strip().replace(" ", "-")
+
+
+def find_marker_line(content: str, lines: List[str], marker: str) -> int:
+    """
+    Return the index of the first line in lines that is marker (ignoring
+    surrounding whitespace), or -1 if there is none. lines must be
+    content.splitlines().
+    """
+    if len(lines) != content.count("\n") + (not content.endswith("\n")):
+        # Separators other than "\n" (e.g. a lone "\r") make splitlines()
+        # indices disagree with "\n" counts, so scan the lines instead.
+        return next((i for i, l in enumerate(lines) if l.strip() == marker), -1)
+    pos = content.find(marker)
+    while pos != -1:
+        idx = content.count("\n", 0, pos)
+        if lines[idx].strip() == marker:
+            return idx
+        pos = content.find(marker, pos + len(marker))
+    return -1
+
+
 def check_or_fix(readme_path: Path, fix: bool) -> int:
     if not readme_path.is_file():
         print(f"Error: file not found: {readme_path}", file=sys.stderr)
@@ -75,10 +109,9 @@ def check_or_fix(readme_path: Path, fix: bool) -> int:
     content = readme_path.read_text(encoding="utf-8")
     lines = content.splitlines()
     # locate ToC markers
-    try:
-        begin_idx = next(i for i, l in enumerate(lines) if l.strip() == BEGIN_TOC)
-        end_idx = next(i for i, l in enumerate(lines) if l.strip() == END_TOC)
-    except StopIteration:
+    begin_idx = find_marker_line(content, lines, BEGIN_TOC)
+    end_idx = find_marker_line(content, lines, END_TOC)
+    if begin_idx == -1 or end_idx == -1:
         print(
             f"Error: Could not locate '{BEGIN_TOC}' or '{END_TOC}' in {readme_path}.",
             file=sys.stderr,
@@ -88,7 +121,7 @@ def check_or_fix(readme_path: Path, fix: bool) -> int:
     current_block = lines[begin_idx + 1 : end_idx]
     current = [l for l in current_block if l.lstrip().startswith("- [")]
     # generate expected ToC
-    expected = generate_toc_lines(content)
+    expected = generate_toc_lines(lines)
     if current == expected:
         return 0
     if not fix:
@@ -109,7 +142,7 @@ def check_or_fix(readme_path: Path, fix: bool) -> int:
     # rebuild file with updated ToC
     prefix = lines[: begin_idx + 1]
     suffix = lines[end_idx:]
-    new_lines = prefix + [""] + expected + [""] + suffix
+    new_lines = chain(prefix, [""], expected, [""], suffix)
     readme_path.write_text("\n".join(new_lines) + "\n", encoding="utf-8")
     print(f"Updated ToC in {readme_path}.")
     return 0